@@ -0,0 +1,161 @@
+import hashlib
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+import streamlit as st
+
+# Image utilities shared by the app pages. Living in a module (rather than the
+# page script Streamlit re-executes on every rerun) means the st.cache_data
+# functions and constants are defined once per process.
+
+# longest side the tabs work at unless "Full resolution" is ticked
+MAX_DIM = 1600
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_image_bgr(file_bytes, max_dim=None):
+    # keyed on the compressed upload; the downscale happens here so only the
+    # working-size image is cached. Returns it with the original decoded shape
+    # and a digest the other caches key on instead of hashing pixel buffers.
+    # IMREAD_COLOR decodes straight to 3-channel BGR, dropping any PNG alpha;
+    # EXIF orientation is ignored, as the original PIL decode did
+    buf = np.frombuffer(file_bytes, np.uint8)
+    img_bgr = cv2.imdecode(buf, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+    if img_bgr is None:
+        raise ValueError("Could not decode the uploaded image")
+    shape = img_bgr.shape
+    h, w = shape[:2]
+    if max_dim is not None and max(h, w) > max_dim:
+        s = max_dim / max(h, w)
+        size = (max(1, int(w*s)), max(1, int(h*s)))
+        img_bgr = cv2.resize(img_bgr, size, interpolation=cv2.INTER_AREA)
+    key = f"{hashlib.blake2b(file_bytes, digest_size=16).hexdigest()}:{max_dim}"
+    return img_bgr, shape, key
+
+# the plain transforms below are uncached; the page only runs them through
+# render/render_detect, which call them on a cache miss
+
+def to_grayscale(img_bgr):
+    return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+
+def rotate_image(img_bgr, angle):
+    if angle == 90:
+        return cv2.rotate(img_bgr, cv2.ROTATE_90_CLOCKWISE)
+    elif angle == 180:
+        # reversed strides on both axes, no pixel copy; cv2.imencode takes the view as-is
+        return img_bgr[::-1, ::-1]
+    elif angle == 270:
+        return cv2.rotate(img_bgr, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return img_bgr
+
+def mirror_image(img_bgr):
+    return cv2.flip(img_bgr, 1)
+
+_GRID_COLOR = np.array((24, 165, 135), np.uint8)
+
+def make_grid(img_bgr, rows=4, cols=4):
+    h, w = img_bgr.shape[:2]
+    cell_h = max(1, h // rows)
+    cell_w = max(1, w // cols)
+    grid = img_bgr.copy()
+
+    # write whole rows/columns at once; drop lines that fall outside tiny images
+    ys = np.arange(1, rows) * cell_h
+    xs = np.arange(1, cols) * cell_w
+    grid[ys[ys < h], :] = _GRID_COLOR
+    grid[:, xs[xs < w]] = _GRID_COLOR
+
+    return grid
+
+_USE_OPENCL = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+
+def detect_objects(img_bgr, min_area=500, gray=None):
+    # blur in place only into a buffer we own: a locally computed gray, or the
+    # private device copy when the T-API runs blur and Canny on the GPU
+    dst = None
+    if gray is None:
+        gray = dst = to_grayscale(img_bgr)
+    if _USE_OPENCL:
+        gray = dst = cv2.UMat(gray)
+    blur = cv2.GaussianBlur(gray, (5,5), 0, dst=dst)
+    edges = cv2.Canny(blur, 50, 150, apertureSize=3, L2gradient=False)
+    if _USE_OPENCL:
+        # contour tracing stays on the CPU
+        edges = edges.get()
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    out = img_bgr.copy()
+    count = 0
+
+    for c in contours:
+        area = cv2.contourArea(c)
+        if area > min_area:
+            x,y,w,h = cv2.boundingRect(c)
+            cv2.rectangle(out, (x,y), (x+w, y+h), (24,165,135), 2)
+            count += 1
+
+    return out, count
+
+def make_cuts(img_bgr):
+    # plain slices are zero-copy views; caching would pickle them into full copies
+    h, w = img_bgr.shape[:2]
+    split = int(w*0.8)
+    return {
+        "Left 50%": img_bgr[:, :w//2],
+        "Right 50%": img_bgr[:, w//2:],
+        "Top 50%": img_bgr[:h//2, :],
+        "Bottom 50%": img_bgr[h//2:, :],
+        "80%": img_bgr[:, :split],
+        "20%": img_bgr[:, split:],
+    }
+
+def _transform(tag, img_bgr):
+    if tag == "original":
+        return img_bgr
+    if tag == "gray":
+        return to_grayscale(img_bgr)
+    if tag.startswith("rotate-"):
+        return rotate_image(img_bgr, int(tag[len("rotate-"):]))
+    if tag == "mirror":
+        return mirror_image(img_bgr)
+    if tag == "grid":
+        return make_grid(img_bgr)
+    if tag.startswith("cut-"):
+        return make_cuts(img_bgr)[tag[len("cut-"):]]
+    raise ValueError(f"Unknown render tag: {tag}")
+
+def _encode_jpeg(img, quality):
+    # hand st.image JPEG bytes so Streamlit doesn't PNG-encode the raw array on every rerun
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode image as JPEG")
+    return buf.tobytes()
+
+# Both renderers are keyed on the upload key from load_image_bgr (plus the tag);
+# the underscored image is left out of the key, and the transform only runs on a
+# miss, so an unchanged rerun does no pixel work at all.
+
+# up to 13 tagged images per upload (original, gray, three rotations, mirror,
+# grid, six cuts), for as many uploads as load_image_bgr keeps
+@st.cache_data(max_entries=4 * 13, show_spinner=False)
+def render(key, tag, _img_bgr, quality=85):
+    return _encode_jpeg(_transform(tag, _img_bgr), quality)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def render_detect(key, _img_bgr, min_area=500, quality=85):
+    detected, count = detect_objects(_img_bgr, min_area)
+    return _encode_jpeg(detected, quality), count
+
+class ImageProperties(NamedTuple):
+    # field names double as the labels shown in the Properties tab
+    Width: int
+    Height: int
+    Channels: int
+    Shape: str
+    Dtype: str
+
+def get_properties(shape, dtype_str):
+    # takes shape/dtype rather than the image; cheap enough that caching would cost more
+    h, w = shape[:2]
+    ch = shape[2] if len(shape)==3 else 1
+    return ImageProperties(w, h, ch, str(shape), dtype_str)
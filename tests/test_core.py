@@ -0,0 +1,142 @@
+import io
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("streamlit")
+
+import imglab.core
+from imglab.core import MAX_DIM, detect_objects, load_image_bgr, render, render_detect, to_grayscale
+
+
+def baseline_detect_count(img_bgr, min_area=500):
+    # the original detect_objects pipeline, kept verbatim as the reference
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    blur = cv2.GaussianBlur(gray, (5,5), 0)
+    edges = cv2.Canny(blur, 50, 150)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return sum(1 for c in contours if cv2.contourArea(c) > min_area)
+
+
+def textured_scene():
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 40, (600, 800, 3), dtype=np.uint8)
+    for _ in range(12):
+        x, y = (int(v) for v in rng.integers(0, 700, 2))
+        w, h = (int(v) for v in rng.integers(20, 160, 2))
+        color = tuple(int(v) for v in rng.integers(80, 256, 3))
+        cv2.rectangle(img, (x, y % 500), (x+w, y % 500 + h), color, -1)
+    for _ in range(6):
+        cx, cy = int(rng.integers(50, 750)), int(rng.integers(50, 550))
+        color = tuple(int(v) for v in rng.integers(80, 256, 3))
+        cv2.circle(img, (cx, cy), int(rng.integers(10, 60)), color, -1)
+    return img
+
+
+def square_with_hole():
+    img = np.zeros((300, 300, 3), np.uint8)
+    cv2.rectangle(img, (50, 50), (250, 250), (255, 255, 255), -1)
+    cv2.rectangle(img, (110, 110), (190, 190), (0, 0, 0), -1)
+    return img
+
+
+def outlined_rectangle():
+    img = np.zeros((300, 400, 3), np.uint8)
+    cv2.rectangle(img, (60, 60), (340, 240), (255, 255, 255), 1)
+    return img
+
+
+@pytest.mark.parametrize("make_image", [textured_scene, square_with_hole, outlined_rectangle])
+def test_detect_objects_count_matches_baseline(make_image):
+    img = make_image()
+    expected = baseline_detect_count(img)
+
+    _, count = detect_objects(img)
+    assert count == expected
+
+    _, count = detect_objects(img, gray=to_grayscale(img))
+    assert count == expected
+
+
+@pytest.mark.skipif(not cv2.ocl.haveOpenCL(), reason="no OpenCL device")
+@pytest.mark.parametrize("make_image", [textured_scene, square_with_hole, outlined_rectangle])
+def test_detect_objects_opencl_count_matches_baseline(make_image, monkeypatch):
+    monkeypatch.setattr(imglab.core, "_USE_OPENCL", True)
+    img = make_image()
+    expected = baseline_detect_count(img)
+
+    _, count = detect_objects(img)
+    assert count == expected
+
+    _, count = detect_objects(img, gray=to_grayscale(img))
+    assert count == expected
+
+
+def test_load_image_bgr_ignores_exif_orientation():
+    Image = pytest.importorskip("PIL.Image")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 CW on display
+    buf = io.BytesIO()
+    Image.new("RGB", (200, 100), (255, 0, 0)).save(buf, "JPEG", exif=exif)
+
+    img_bgr, shape, _ = load_image_bgr(buf.getvalue())
+    assert img_bgr.shape == shape == (100, 200, 3)
+
+
+def png_bytes(h, w):
+    img = np.zeros((h, w, 3), np.uint8)
+    cv2.rectangle(img, (w // 4, h // 4), (w // 2, h // 2), (0, 255, 0), -1)
+    ok, buf = cv2.imencode(".png", img)
+    assert ok
+    return buf.tobytes()
+
+
+def test_load_image_bgr_fits_longest_side_and_keeps_aspect():
+    img_bgr, shape, _ = load_image_bgr(png_bytes(1800, 2400), MAX_DIM)
+    assert shape == (1800, 2400, 3)
+    assert img_bgr.shape == (1200, MAX_DIM, 3)
+
+
+def test_load_image_bgr_leaves_small_images_alone():
+    img_bgr, shape, _ = load_image_bgr(png_bytes(300, 400), MAX_DIM)
+    assert img_bgr.shape == shape == (300, 400, 3)
+
+
+def test_load_image_bgr_full_resolution():
+    img_bgr, shape, _ = load_image_bgr(png_bytes(1800, 2400), None)
+    assert img_bgr.shape == shape == (1800, 2400, 3)
+
+
+def test_load_image_bgr_key_depends_on_max_dim():
+    data = png_bytes(1800, 2400)
+    _, _, fitted_key = load_image_bgr(data, MAX_DIM)
+    _, _, full_key = load_image_bgr(data, None)
+    assert fitted_key != full_key
+    assert load_image_bgr(data, MAX_DIM)[2] == fitted_key
+
+
+@pytest.mark.parametrize("tag, shape", [
+    ("original", (300, 400, 3)),
+    ("gray", (300, 400)),
+    ("rotate-90", (400, 300, 3)),
+    ("rotate-180", (300, 400, 3)),
+    ("cut-Left 50%", (300, 200, 3)),
+    ("cut-20%", (300, 80, 3)),
+])
+def test_render_transforms_by_tag(tag, shape):
+    img = np.zeros((300, 400, 3), np.uint8)
+    jpeg = render("render-test", tag, img)
+    decoded = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_UNCHANGED)
+    assert decoded.shape == shape
+
+
+def test_render_rejects_unknown_tag():
+    with pytest.raises(ValueError):
+        render("render-test", "sepia", np.zeros((10, 10, 3), np.uint8))
+
+
+def test_render_detect_returns_the_detect_count():
+    img = square_with_hole()
+    _, count = render_detect("render-detect-test", img)
+    assert count == baseline_detect_count(img)